@@ -1,8 +1,10 @@
 import datetime
+from functools import lru_cache
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 import os
-from typing import List,Dict,Any,Optional
+from typing import List,Dict,Any,Optional,Tuple
 import logging
 from dotenv import load_dotenv
 
@@ -16,6 +18,16 @@ SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
 
 SERVICE_ACCOUNT_FILE = os.environ.get('GOOGLE_CALENDAR_SERVICE_ACCOUNT_FILE', 'credentials.json')
 
+# Partial response: only the fields the agent uses
+EVENT_FIELDS = 'etag,items(summary,start(dateTime,date),htmlLink)'
+
+@lru_cache(maxsize=2)
+def _day_bounds(day: datetime.date) -> Tuple[str,str]:
+    """ISO timestamps for the first and last instant of a UTC day"""
+    start_of_day = datetime.datetime.combine(day, datetime.time.min, datetime.timezone.utc).isoformat()
+    end_of_day = datetime.datetime.combine(day, datetime.time.max, datetime.timezone.utc).isoformat()
+    return start_of_day, end_of_day
+
 class CalendarEventTool:
     """
     MCP Tool to fetch today's learning events from Google Calendar
@@ -23,6 +35,8 @@ class CalendarEventTool:
 
     def __init__(self,calendar_id: Optional[str] = None):
         self.calendar_id = calendar_id or os.environ.get('LEARNING_CALENDAR_ID')
+        # UTC day -> (etag, processed events) of the last successful fetch
+        self._day_cache: Dict[str,Tuple[Optional[str],List[Dict[str,Any]]]] = {}
 
         if not self.calendar_id:
             logger.error("FATAL: LEARNING_CALENDAR_ID is not set.")
@@ -46,23 +60,32 @@ class CalendarEventTool:
         This is the primary function called by the AI Agent.
         """        
 
-        now = datetime.datetime.now(datetime.timezone.utc)
-        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
-        end_of_day = now.replace(hour=23, minute=59, second=59, microsecond=999999).isoformat()
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        start_of_day, end_of_day = _day_bounds(today)
+
+        day = today.isoformat()
+        cached = self._day_cache.get(day)
 
         try:
-            events_result = self.service.events().list(
+            request = self.service.events().list(
                 calendarId = self.calendar_id,
                 timeMin = start_of_day,
                 timeMax = end_of_day,
                 singleEvents = True,
-                orderBy = 'startTime'
-            ).execute()
+                orderBy = 'startTime',
+                fields = EVENT_FIELDS
+            )
+            if cached and cached[0]:
+                # Unchanged calendar answers 304 Not Modified with no body
+                request.headers['If-None-Match'] = cached[0]
+            events_result = request.execute()
 
             events = events_result.get('items',[])
 
             if not events:
                 logger.info("No Events for Today")
+                self._day_cache = {day: (events_result.get('etag'), [])}
+                return []
             
             processed_events = []
 
@@ -76,6 +99,15 @@ class CalendarEventTool:
                     'link': event.get('htmlLink', 'N/A')
                     }
                 )
+
+            self._day_cache = {day: (events_result.get('etag'), processed_events)}
+            return processed_events
+        except HttpError as e:
+            if e.resp.status == 304 and cached:
+                logger.info("Calendar unchanged since last fetch, using cached events")
+                return cached[1]
+            logger.error(f"Error fetching calendar events: {e}")
+            return []
         except Exception as e:
             logger.error(f"Error fetching calendar events: {e}")
             # Return an empty list or raise an error for the agent to handle
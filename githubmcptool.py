@@ -1,9 +1,19 @@
 from typing import List,Dict,Optional
 import os
-import requests
+import asyncio
+import heapq
+import math
+import time
+import httpx
+import orjson
 import logging
-from prometheus_client import Counter,Histogram,Gauge,start_http_server
+from contextlib import asynccontextmanager
+from operator import itemgetter
+from cachetools import LRUCache,TTLCache
+from prometheus_client import Counter,Histogram,Gauge
+from prometheus_fastapi_instrumentator import Instrumentator
 from fastapi import FastAPI,Depends,HTTPException,Query
+from fastapi.responses import ORJSONResponse
 from fastapi_mcp import FastApiMCP
 from pydantic import BaseModel,Field
 from dotenv import load_dotenv
@@ -16,6 +26,37 @@ logger = logging.getLogger(__name__)
 MCP_BASE_URL= os.environ.get("MCP_BASE_URL", "http://localhost:8000")
 
 GITHUB_SEARCHES = Counter('github_searches_total', 'Total GitHub searches', ['status'])
+GITHUB_CACHE = Counter('github_cache_total', 'GitHub recommendation cache lookups', ['result'])
+
+RECOMMENDATION_CACHE_SIZE = 512
+RECOMMENDATION_CACHE_TTL = int(os.environ.get('RECOMMENDATION_CACHE_TTL', 3600))
+
+GITHUB_MAX_CONCURRENCY = 8
+RATE_LIMIT_RETRIES = 3
+# Total time one request may spend waiting on rate limits. It must stay well below the
+# orchestrator's 30s MCP timeout; longer waits fail fast with GitHubRateLimitError instead
+RATE_LIMIT_WAIT_BUDGET = 15
+
+# Batched lookups use one aliased GraphQL query; REST stays the default and the fallback
+GITHUB_USE_GRAPHQL = os.environ.get('GITHUB_USE_GRAPHQL', 'false').lower() in ('1', 'true', 'yes')
+GRAPHQL_REPOSITORY_FIELDS = """
+nodes {
+  ... on Repository {
+    nameWithOwner url description stargazerCount forkCount
+    primaryLanguage { name } hasWikiEnabled updatedAt
+  }
+}
+"""
+
+TECH_KEYWORDS = (
+    'python', 'javascript', 'java', 'react', 'node', 'ai', 'ml',
+    'agent', 'llm', 'langchain', 'api', 'web', 'cloud', 'docker',
+    'kubernetes', 'tensorflow', 'pytorch', 'django', 'flask'
+)
+HANDS_ON_KEYWORDS = frozenset({'tutorial', 'example', 'hands-on', 'practical', 'guide', 'workshop', 'project'})
+HANDS_ON_SCORE = 5
+WIKI_SCORE = 5
+README_SCORE = 5
 
 # --- Pydantic Models for FastAPI/MCP ---
 # Define the response schema clearly for the AI agent (Tool Definition)
@@ -28,6 +69,76 @@ class RepositoryRecommendation(BaseModel):
     score: float = Field(..., description="The hands-on content score assigned by the analysis tool.")
     language: Optional[str] = Field(None, description="The primary language of the repository.")
 
+class GitHubRateLimitError(Exception):
+    """GitHub is rate limiting us for longer than a request may wait"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"GitHub rate limit exceeded, retry in {retry_after:.0f}s")
+
+class GitHubRateLimiter:
+    """Paces GitHub API calls for one rate-limit resource (e.g. 'search', 'graphql')
+
+    GitHub tracks each resource as a separate quota, so every resource needs its own limiter.
+    """
+
+    def __init__(self, resource: str, max_concurrency: int = GITHUB_MAX_CONCURRENCY):
+        self.resource = resource
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.retry_at = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.semaphore.release()
+
+    def wait_time(self) -> float:
+        """Seconds to wait before the next call is allowed"""
+        now = time.time()
+        wait = self.retry_at - now
+        if self.remaining == 0:
+            wait = max(wait, self.reset_at - now)
+        return max(wait, 0.0)
+
+    async def wait(self, deadline: float):
+        """Sleep until the next call is allowed, or raise if that is past the (monotonic) deadline"""
+        delay = self.wait_time()
+        if delay <= 0:
+            return
+        if time.monotonic() + delay > deadline:
+            raise GitHubRateLimitError(delay)
+        logger.warning(f"GitHub rate limit reached, waiting {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    def update(self, response: httpx.Response):
+        """Refresh the limits from a GitHub response"""
+        headers = response.headers
+        if headers.get('X-RateLimit-Resource', self.resource) != self.resource:
+            return
+        if 'X-RateLimit-Remaining' in headers:
+            self.remaining = int(headers['X-RateLimit-Remaining'])
+        if 'X-RateLimit-Reset' in headers:
+            self.reset_at = float(headers['X-RateLimit-Reset'])
+        if 'Retry-After' in headers:
+            self.retry_at = time.time() + float(headers['Retry-After'])
+
+    def is_limited(self, response: httpx.Response) -> bool:
+        """Whether GitHub rejected the call because of a primary or secondary rate limit"""
+        if response.status_code == 429:
+            return True
+        return response.status_code == 403 and (
+            'Retry-After' in response.headers or response.headers.get('X-RateLimit-Remaining') == '0'
+        )
+
+    def back_off(self, attempt: int):
+        """Fall back to exponential back-off when GitHub gives no explicit wait"""
+        if self.wait_time() == 0:
+            self.retry_at = time.time() + 2 ** attempt
+
 class GitHubMcpTool:
     """MCP Tool for Researching Github Repository"""
 
@@ -44,8 +155,51 @@ class GitHubMcpTool:
         else:
             logger.warning("Github_Token not found.")
 
+        # One pooled client for the whole process so concurrent searches share keep-alive connections
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60)
+        )
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            timeout=10,
+            headers=self.headers
+        )
+
+        self.search_limiter = GitHubRateLimiter('search')
+        self.graphql_limiter = GitHubRateLimiter('graphql')
+
+        # (event_title, max_results) -> ranked recommendations
+        self.recommendation_cache = TTLCache(maxsize=RECOMMENDATION_CACHE_SIZE, ttl=RECOMMENDATION_CACHE_TTL)
+        # search query -> (ETag, repos); revalidated with If-None-Match, a 304 costs no rate limit
+        self.etag_cache = LRUCache(maxsize=RECOMMENDATION_CACHE_SIZE)
+
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self.client.aclose()
+
+    async def _request(self, method: str, url: str, limiter: GitHubRateLimiter, **kwargs) -> httpx.Response:
+        """Send a GitHub API request, waiting out and retrying rate-limit rejections
+
+        Raises GitHubRateLimitError when the limit does not clear within RATE_LIMIT_WAIT_BUDGET.
+        """
 
-    def search_repositories(self, query:str, keywords: List[str]) -> List[dict]:
+        deadline = time.monotonic() + RATE_LIMIT_WAIT_BUDGET
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            await limiter.wait(deadline)
+            async with limiter:
+                response = await self.client.request(method, url, **kwargs)
+            limiter.update(response)
+
+            if not limiter.is_limited(response):
+                return response
+
+            GITHUB_SEARCHES.labels(status='rate_limited').inc()
+            limiter.back_off(attempt)
+        raise GitHubRateLimitError(limiter.wait_time())
+
+    async def search_repositories(self, query:str, keywords: List[str]) -> List[dict]:
         """Search Github Repositories based on query and keyword"""
 
         try:
@@ -65,50 +219,119 @@ class GitHubMcpTool:
                 'per_page': 10
             }
 
-            response = requests.get(
+            cached = self.etag_cache.get(search_query)
+            headers = {'If-None-Match': cached[0]} if cached else None
+
+            response = await self._request(
+                'GET',
                 f'{self.base_url}/search/repositories',
-                headers=self.headers,
-                params=params
+                self.search_limiter,
+                params=params,
+                headers=headers
             )
 
-            if response.status_code == 200:
+            if response.status_code == 304 and cached:
+                GITHUB_SEARCHES.labels(status='not_modified').inc()
+                return cached[1]
+            elif response.status_code == 200:
                 GITHUB_SEARCHES.labels(status='success').inc()
-                repos = response.json().get('items',[])
+                repos = orjson.loads(response.content).get('items',[])
+                etag = response.headers.get('ETag')
+                if etag:
+                    self.etag_cache[search_query] = (etag, repos)
                 return repos
             else:
                 GITHUB_SEARCHES.labels(status='error').inc()
                 logger.error(f"Github API Error: {response.status_code}")
                 return []
+        except GitHubRateLimitError:
+            raise
         except Exception as e:
             GITHUB_SEARCHES.labels(status='error').inc()
             logger.error(f"Github searchh failed: {str(e)}",e)
             return []
         
 
-    def analyze_repository(self,repo:Dict) -> Dict:
+    async def search_repositories_graphql(self, queries: List[str]) -> Optional[List[List[dict]]]:
+        """Search Github Repositories for several queries in a single GraphQL request
 
-        """Analyze repository for hands-on content"""
+        Repositories are returned in the REST search item shape. Returns None when the
+        request fails so the caller can fall back to REST.
+        """
 
-        score = 0
+        search_queries = [f"{query} in:name,description sort:stars-desc" for query in queries]
+        variables = {f'q{i}': search_query for i, search_query in enumerate(search_queries)}
+        definitions = ', '.join(f'${name}: String!' for name in variables)
+        searches = ' '.join(
+            f'{name}: search(query: ${name}, type: REPOSITORY, first: 10) {{ {GRAPHQL_REPOSITORY_FIELDS} }}'
+            for name in variables
+        )
+        payload = {'query': f'query({definitions}) {{ {searches} }}', 'variables': variables}
 
-        score += min(repo.get('stargazers_count',0) / 100 , 50)
+        logger.info(f"Github GraphQL Search for {len(search_queries)} queries")
 
-        score += min(repo.get('forks_count',0) / 100 , 20)
+        try:
+            response = await self._request(
+                'POST',
+                f'{self.base_url}/graphql',
+                self.graphql_limiter,
+                content=orjson.dumps(payload),
+                headers={'Content-Type': 'application/json'}
+            )
+            body = orjson.loads(response.content) if response.status_code == 200 else {}
+            data = body.get('data')
 
-        description = (repo.get('description','') or '').lower()
-            
-        hands_on_keywords = ['tutorial', 'example', 'hands-on', 'practical', 'guide', 'workshop', 'project']
+            if not data or body.get('errors'):
+                GITHUB_SEARCHES.labels(status='error').inc()
+                logger.error(f"Github GraphQL Error: {response.status_code} {body.get('errors')}")
+                return None
+
+            GITHUB_SEARCHES.labels(status='success').inc()
+            return [
+                [self._from_graphql(node) for node in (data.get(name) or {}).get('nodes', []) if node]
+                for name in variables
+            ]
+        except Exception as e:
+            GITHUB_SEARCHES.labels(status='error').inc()
+            logger.error(f"Github GraphQL search failed: {e}")
+            return None
 
-        for keyword in hands_on_keywords:
-            if keyword in description:
-                score += 5
+    def _from_graphql(self,node:Dict) -> Dict:
+        """Map a GraphQL Repository node onto the REST search item keys"""
+        return {
+            'full_name': node.get('nameWithOwner'),
+            'html_url': node.get('url'),
+            'description': node.get('description'),
+            'stargazers_count': node.get('stargazerCount', 0),
+            'forks_count': node.get('forkCount', 0),
+            'language': (node.get('primaryLanguage') or {}).get('name'),
+            'has_wiki': node.get('hasWikiEnabled'),
+            'updated_at': node.get('updatedAt')
+        }
+
+    def score_repository(self,repo:Dict) -> float:
 
+        """Score repository for hands-on content"""
+
+        stars = repo.get('stargazers_count',0)
+        forks = repo.get('forks_count',0)
+        # Lower-cased once; every text check below works on this copy
+        description = (repo.get('description') or '').lower()
+
+        score = min(stars / 100 , 50) + min(forks / 100 , 20)
+
+        for keyword in HANDS_ON_KEYWORDS:
+            if keyword in description:
+                score += HANDS_ON_SCORE
 
         if repo.get('has_wiki'):
-            score += 5
-        if 'README'in description.upper():
-            score += 5
+            score += WIKI_SCORE
+        if 'readme' in description:
+            score += README_SCORE
 
+        return score
+
+    def _build_recommendation(self,repo:Dict,score:float) -> Dict:
         return {
             'name': repo.get('full_name'),
             'url': repo.get('html_url'),
@@ -120,41 +343,106 @@ class GitHubMcpTool:
             'updated_at': repo.get('updated_at')
         }
         
-    def get_top_recommendations(self,event_title:str , max_results: int = 3) -> List[Dict]:
+    async def get_top_recommendations(self,event_title:str , max_results: int = 3) -> List[Dict]:
         """Get top GitHub repository recommendations for an event"""
 
-        keywords = self._extract_keywords(event_title)
-        
-        repos = self.search_repositories(event_title,keywords)
-
-        analyzed_repos = [self.analyze_repository(repo) for repo in repos]
+        cached = self._get_cached((event_title, max_results))
+        if cached is not None:
+            return cached
+        return await self._fetch_recommendations(event_title,max_results)
 
-        sorted_repos = sorted(analyzed_repos,key=lambda x: x['score'],reverse=True)
+    async def _fetch_recommendations(self,event_title:str , max_results: int) -> List[Dict]:
+        """Search and rank an event that missed the cache, caching the result"""
 
-        return sorted_repos[:max_results]
+        keywords = self._extract_keywords(event_title)
+        
+        repos = await self.search_repositories(event_title,keywords)
+
+        return self._cache_ranked(event_title,repos,max_results)
+
+    def _get_cached(self,cache_key) -> Optional[List[Dict]]:
+        cached = self.recommendation_cache.get(cache_key)
+        GITHUB_CACHE.labels(result='miss' if cached is None else 'hit').inc()
+        return cached
+
+    def _cache_ranked(self,event_title: str, repos: List[Dict], max_results: int) -> List[Dict]:
+        top_repos = self._rank_repositories(repos,max_results)
+        # Empty results may be a failed search, so only successful lookups are cached
+        if top_repos:
+            self.recommendation_cache[(event_title, max_results)] = top_repos
+        return top_repos
+
+    def _rank_repositories(self,repos: List[Dict], max_results: int) -> List[Dict]:
+        # Rank on bare scores and only build response dicts for the repos that are returned
+        scored_repos = [(self.score_repository(repo), repo) for repo in repos]
+
+        top_scored = heapq.nlargest(max_results,scored_repos,key=itemgetter(0))
+
+        return [self._build_recommendation(repo,score) for score, repo in top_scored]
+
+    async def search_many(self,event_titles: List[str], max_results: int = 3) -> Dict[str,List[Dict]]:
+        """Get recommendations for several events concurrently, keyed by event title"""
+
+        titles = list(dict.fromkeys(event_titles))
+
+        # Each title's cache lookup is made (and counted) once, whichever search path follows
+        recommendations = {title: self._get_cached((title, max_results)) for title in titles}
+        misses = [title for title, cached in recommendations.items() if cached is None]
+        if not misses:
+            return recommendations
+
+        if GITHUB_USE_GRAPHQL and self.github_token:
+            results = await self.search_repositories_graphql(misses)
+            if results is not None:
+                for title, repos in zip(misses, results):
+                    recommendations[title] = self._cache_ranked(title,repos,max_results)
+                return recommendations
+
+        coros = [self._fetch_recommendations(title,max_results) for title in misses]
+        results = await asyncio.gather(*coros, return_exceptions=True)
+
+        for title, result in zip(misses, results):
+            if isinstance(result, GitHubRateLimitError):
+                raise result
+            if isinstance(result, Exception):
+                logger.error(f"Recommendation for '{title}' failed: {result}")
+                result = []
+            recommendations[title] = result
+        return recommendations
     
     def _extract_keywords(self,text: str) -> List[str]:
         """Extract relevant keywords from event title"""
-        tech_keywords = [
-            'python', 'javascript', 'java', 'react', 'node', 'ai', 'ml', 
-            'agent', 'llm', 'langchain', 'api', 'web', 'cloud', 'docker',
-            'kubernetes', 'tensorflow', 'pytorch', 'django', 'flask'
-        ]
-
         text_lower = text.lower()
-        found_keywords = [kw for kw in tech_keywords if kw in text_lower]
-        return found_keywords
-    
+        return [kw for kw in TECH_KEYWORDS if kw in text_lower]
+
+github_tool = GitHubMcpTool()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await github_tool.aclose()
+
 app = FastAPI(
     title="GitHUb Learning Tool MCP Server",
     description="A Model Context Protocol server exposing a tool to find the best hands-on GitHub repositories for learning events.",
     version="1.0.0",
     servers=[
         {"url": MCP_BASE_URL}
-    ]
+    ],
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-github_tool = GitHubMcpTool()
+# Request metrics plus the GitHub counters on /metrics; aggregates workers when PROMETHEUS_MULTIPROC_DIR is set
+Instrumentator().instrument(app).expose(app, endpoint="/metrics", include_in_schema=False)
+
+def raise_rate_limited(error: GitHubRateLimitError):
+    """Report a GitHub rate limit to the caller right away instead of letting it time out"""
+    raise HTTPException(
+        status_code=429,
+        detail=f"{error}. Try again later.",
+        headers={'Retry-After': str(math.ceil(error.retry_after))}
+    )
 
 @app.get(
     "/recommendation",
@@ -178,14 +466,40 @@ async def get_top_recommendation_endpoint(
 
     try:
         #Call the core logic of the tool instance
-        results = github_tool.get_top_recommendations(event_title,max_results)
+        results = await github_tool.get_top_recommendations(event_title,max_results)
         return results
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         # Catch API errors (e.g., GitHub rate limit, 404)
         raise HTTPException(
             status_code=e.response.status_code,
-            detail=f"GitHub API error: {e.response.status_code} - {e.response.reason}. Check server logs for details."
+            detail=f"GitHub API error: {e.response.status_code} - {e.response.reason_phrase}. Check server logs for details."
         )
+    except GitHubRateLimitError as e:
+        raise_rate_limited(e)
+
+@app.get(
+    "/recommendation/batch",
+    response_model=Dict[str,List[RepositoryRecommendation]],
+    operation_id="get_top_github_recommendations_batch",
+    tags=["github_tool"]
+)
+async def get_top_recommendation_batch_endpoint(
+    event_titles: List[str] = Query(
+        ...,
+        description="The titles of all learning events to research in one call."
+    ),
+    max_results: int = Query(3, gt=0, le=10, description="The maximum number of repositories to return per event.")
+):
+    """
+    Get top GitHub repository recommendations for several learning events at once.
+
+    All events are researched concurrently; the response maps each event title to its ranked repositories.
+    """
+
+    try:
+        return await github_tool.search_many(event_titles,max_results)
+    except GitHubRateLimitError as e:
+        raise_rate_limited(e)
     
 mcp = FastApiMCP(
     app,
@@ -194,9 +508,3 @@ mcp = FastApiMCP(
 )
 
 mcp.mount()
-
-if __name__ == "__main__":
-    import uvicorn
-    start_http_server(8001)
-    logger.info("Starting FastAPI/MCP server on port 8000...")
-    uvicorn.run(app,host="127.0.0.1",port=8000)
\ No newline at end of file
@@ -1,7 +1,11 @@
 import os
+import asyncio
+import inspect
 import logging
-import requests
-import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import httpx
+import orjson
 from typing import List,Dict,Any,Optional
 from dotenv import load_dotenv
 
@@ -20,14 +24,31 @@ logger = logging.getLogger(__name__)
 GEMINI_MODEL = 'gemini-2.5-flash'
 LEARNER_PHONE_NUMBER = os.environ.get('LEARNER_PHONE_NUMBER')
 GITHUB_MCP_URL = os.environ.get('GITHUB_MCP_URL', 'http://localhost:8000/recommendation')
+# Repositories per event sent back to Gemini; the final SMS cites at most two
+LLM_MAX_REPOS = 2
+
+# Blocking tools (Google Calendar, Twilio) are I/O bound and run here, at most 8 at a time
+TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix='agent-tool')
 
 class GitHubMcpClient:
     """Client to call the external Github MCP tool """
 
     def __init__(self,base_url : str):
         self.url = base_url
+        # Reused across tool calls so the MCP server connection stays alive between turns
+        self.client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                retries=3,
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=8)
+            ),
+            timeout=30
+        )
+
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self.client.aclose()
 
-    def get_top_github_recommendations(self,event_title: str,max_results: int =3) -> List[Dict[str,any]]:
+    async def get_top_github_recommendations(self,event_title: str,max_results: int =3) -> List[Dict[str,any]]:
         """
         Retrieves, scores, and ranks the top GitHub repositories for a given learning event title.
         
@@ -38,19 +59,40 @@ class GitHubMcpClient:
         logger.info(f"Calling Github MCP for event: {event_title}")
 
         try:
-            response = requests.get(
+            response = await self.client.get(
                 self.url,
                 params={'event_title': event_title, 'max_results': max_results}
             )
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error calling GitHub MCP: {e}")
 
+    async def get_top_github_recommendations_batch(self,event_titles: List[str],max_results: int =3) -> Dict[str,List[Dict[str,Any]]]:
+        """
+        Retrieves, scores, and ranks the top GitHub repositories for several learning event titles in one call.
+
+        Prefer this over calling get_top_github_recommendations once per event; the result maps
+        each event title to its ranked repositories.
+        """
+
+        logger.info(f"Calling Github MCP for {len(event_titles)} events")
+
+        try:
+            response = await self.client.get(
+                f"{self.url}/batch",
+                params={'event_titles': event_titles, 'max_results': max_results}
+            )
+            response.raise_for_status()
+            return orjson.loads(response.content)
+
+        except httpx.HTTPError as e:
+            logger.error(f"Error calling GitHub MCP batch: {e}")
+
 SYSTEM_PROMPT = """
 You are a dedicated AI Learning Planner. Your purpose is to ensure the user maximizes their daily learning opportunities.
-Action Flow: 1. Call get_today_events. 2. Based on event titles, call get_top_github_recommendations for resources. 3. Synthesize the results. 4. Call send_sms_notification as the final action.
+Action Flow: 1. Call get_today_events. 2. Based on event titles, call get_top_github_recommendations_batch once with all titles for resources. 3. Synthesize the results. 4. Call send_sms_notification as the final action.
 Constraints: The final message must be concise (<300 chars) and cite the top 1-2 GitHub resources.
 """
 
@@ -64,20 +106,69 @@ except Exception as e:
     logger.critical(f"Tool Initialization Failed: {e}")
     exit()
 
+# Today's events are fetched in the background while Gemini plans its first turn
+_calendar_prefetch: Optional[asyncio.Future] = None
+
+def prefetch_today_events():
+    """Start fetching today's events on the tool executor"""
+    global _calendar_prefetch
+    loop = asyncio.get_running_loop()
+    _calendar_prefetch = asyncio.ensure_future(loop.run_in_executor(TOOL_EXECUTOR, calendar_tool.get_today_events))
+
+async def get_today_events() -> List[Dict[str,Any]]:
+    """Return the prefetched events, or fetch them if no prefetch is pending"""
+    global _calendar_prefetch
+    task, _calendar_prefetch = _calendar_prefetch, None
+    if task is not None:
+        return await task
+    return await asyncio.get_running_loop().run_in_executor(TOOL_EXECUTOR, calendar_tool.get_today_events)
+
 # Map tool names to their execution functions
 TOOL_EXECUTOR_MAP = {
-    'get_today_events': calendar_tool.get_today_events,
+    'get_today_events': get_today_events,
     'get_top_github_recommendations': github_tool_client.get_top_github_recommendations,
+    'get_top_github_recommendations_batch': github_tool_client.get_top_github_recommendations_batch,
     'send_sms_notification': twilio_tool.send_sms_notification,
 }
 
-
-def run_agent():
+GITHUB_TOOLS = ('get_top_github_recommendations', 'get_top_github_recommendations_batch')
+
+def _summarize_repos(repos: List[Dict[str,Any]]) -> List[Dict[str,Any]]:
+    return [{'name': repo.get('name'), 'url': repo.get('url')} for repo in repos[:LLM_MAX_REPOS]]
+
+def _summarize_for_llm(tool_name: str, result: Any) -> Dict[str,Any]:
+    """Trim a tool result to what the planner cites, wrapped in the dict Gemini expects"""
+    if tool_name in GITHUB_TOOLS and result is None:
+        # GitHubMcpClient returns None when the MCP server call failed; don't pass that off as "no repos"
+        return {"error": "GitHub MCP request failed", "status": "failed"}
+    if tool_name == 'get_top_github_recommendations':
+        result = _summarize_repos(result)
+    elif tool_name == 'get_top_github_recommendations_batch':
+        result = {title: _summarize_repos(repos) for title, repos in result.items()}
+    elif tool_name == 'get_today_events':
+        result = [{k: v for k, v in event.items() if k != 'link'} for event in (result or [])]
+    return result if isinstance(result, dict) else {'result': result}
+
+async def run_tool(call: types.FunctionCall) -> Any:
+    """Execute one Gemini function call; blocking tools run on TOOL_EXECUTOR"""
+    tool_func = TOOL_EXECUTOR_MAP.get(call.name)
+    if tool_func is None:
+        logger.warning(f"Tool {call.name} not found in map.")
+        raise LookupError(f"Unknown tool {call.name}")
+    args = dict(call.args)
+    if inspect.iscoroutinefunction(tool_func):
+        return await tool_func(**args)
+    return await asyncio.get_running_loop().run_in_executor(TOOL_EXECUTOR, partial(tool_func, **args))
+
+async def run_agent():
+
+    prefetch_today_events()
 
     client = genai.Client()                   
     tools_list = [
         calendar_tool.get_today_events,
         github_tool_client.get_top_github_recommendations,
+        github_tool_client.get_top_github_recommendations_batch,
         twilio_tool.send_sms_notification
     ]
 
@@ -86,48 +177,53 @@ def run_agent():
         f"and send the final message to the learner at {LEARNER_PHONE_NUMBER}."
     )
 
-    session = client.chats.create(
+    session = client.aio.chats.create(
         model= GEMINI_MODEL,
         config=types.GenerateContentConfig(
             tools=tools_list,
-            system_instruction=SYSTEM_PROMPT
+            system_instruction=SYSTEM_PROMPT,
+            # Tools are dispatched by the loop below (some of them are coroutines)
+            automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True)
         )
     )
 
     # send the initial request
-    response = session.send_message(initial_prompt)
+    response = await session.send_message(initial_prompt)
 
     # Tool execution loop
     for _ in range(15):
         if response.function_calls:
-            tool_responses = []
+            calls = response.function_calls
+
+            # All calls of one turn run concurrently; responses keep the order of the calls
+            results = await asyncio.gather(*(run_tool(call) for call in calls), return_exceptions=True)
 
-            for call in response.function_calls:
+            tool_responses = []
+            for call, tool_result in zip(calls, results):
                 tool_name = call.name
-                args=dict(call.args)
-                
-                tool_func=TOOL_EXECUTOR_MAP.get(tool_name)
-
-                if tool_func:
-                    try:
-                        tool_result = tool_func(**args)
-                        logger.info(f"Executed {tool_name}. Result: {json.dumps(tool_result)[:100]}...")
-                        tool_responses.append(types.Part.from_function_response(
-                            name=tool_name,
-                            response=tool_result
-                        ))
-                        if tool_name == 'send_sms_notification':
-                            logger.info("Final SMS notification successfully triggered by the agent.")
-                            return f"Plan successfully sent to {LEARNER_PHONE_NUMBER}."
-
-                    except Exception as e:
-                        logger.error(f"Error executing tool {tool_name}: {e}")
-                        tool_responses.append(types.Part.from_function_response(
-                            name=tool_name,
-                            response={"error": str(e), "status": "failed"}
-                        ))
-                else:
-                    logger.warning(f"Tool {tool_name} not found in map.")
+
+                try:
+                    if isinstance(tool_result, Exception):
+                        raise tool_result
+                    logger.info(f"Executed {tool_name}. Result: {orjson.dumps(tool_result)[:100].decode(errors='ignore')}...")
+                    # A delivered SMS ends the run; Gemini gets no further turn
+                    if tool_name == 'send_sms_notification' and tool_result:
+                        logger.info("Final SMS notification successfully triggered by the agent.")
+                        return f"Plan successfully sent to {LEARNER_PHONE_NUMBER}."
+                    tool_responses.append(types.Part.from_function_response(
+                        name=tool_name,
+                        response=_summarize_for_llm(tool_name, tool_result)
+                    ))
+
+                except Exception as e:
+                    logger.error(f"Error executing tool {tool_name}: {e}")
+                    tool_responses.append(types.Part.from_function_response(
+                        name=tool_name,
+                        response={"error": str(e), "status": "failed"}
+                    ))
+
+            # Hand the results back so Gemini can plan its next step
+            response = await session.send_message(tool_responses)
 
         else:
             final_text = response.text
@@ -137,8 +233,15 @@ def run_agent():
     logger.error("Agent exceeded the maximum loop iterations.")
     return "Agent planning failed: Loop iteration limit exceeded."
 
+async def main():
+    try:
+        return await run_agent()
+    finally:
+        await github_tool_client.aclose()
+        TOOL_EXECUTOR.shutdown(wait=False)
+
 if __name__ == "__main__":
     logger.info("--- Starting ADK-Style Learning Agent Orchestration ---")
-    final_output = run_agent()
+    final_output = asyncio.run(main())
     logger.info(f"Final Agent Status: {final_output}")
     logger.info("--- Orchestration Complete ---")    
\ No newline at end of file
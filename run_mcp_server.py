@@ -0,0 +1,38 @@
+import os
+import shutil
+import logging
+import uvicorn
+from dotenv import load_dotenv
+
+# Deliberately does not import githubmcptool: uvicorn loads the app by import string, and a
+# second copy of that module (as __main__) would register its Prometheus metrics twice
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO,format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# GitHub rate limiters and recommendation/ETag caches live in each worker process, so extra
+# workers each pace the shared per-token quota blind and start with cold caches. Keep one
+# worker unless that state is moved out of process.
+MCP_WORKERS = int(os.environ.get("MCP_WORKERS", 1))
+# Shared by all uvicorn workers so /metrics reports the whole server, not one process. Used (and
+# cleared) only when PROMETHEUS_MULTIPROC_DIR is unset; a directory you export yourself must
+# already exist and is left untouched, so empty it between runs
+DEFAULT_PROMETHEUS_MULTIPROC_DIR = "/tmp/githubmcptool_metrics"
+
+if __name__ == "__main__":
+    # Workers import the app fresh, so the directory must be set (and emptied) before they start
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        shutil.rmtree(DEFAULT_PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+        os.makedirs(DEFAULT_PROMETHEUS_MULTIPROC_DIR)
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = DEFAULT_PROMETHEUS_MULTIPROC_DIR
+    logger.info(f"Starting FastAPI/MCP server on port 8000 with {MCP_WORKERS} workers...")
+    uvicorn.run(
+        "githubmcptool:app",
+        host="127.0.0.1",
+        port=8000,
+        workers=MCP_WORKERS,
+        loop="uvloop",
+        http="httptools"
+    )